@@ -8,43 +8,76 @@ Usage:
 """
 
 import argparse
-import csv
 from pathlib import Path
 
 try:
-    import matplotlib.pyplot as plt
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
 except ImportError as exc:
     raise SystemExit("matplotlib is required for plotting. Install it via `pip install matplotlib`.") from exc
 
+try:
+    import pandas as pd
+except ImportError as exc:
+    raise SystemExit("pandas is required for plotting. Install it via `pip install pandas`.") from exc
+
+matplotlib.rcParams["path.simplify"] = True
+matplotlib.rcParams["path.simplify_threshold"] = 1.0
+
+METRICS = [
+    ("time_sec", "Runtime (s)"),
+    ("max_rss_kb", "Peak RSS (KB)"),
+    ("nodes", "Nodes created"),
+]
+
+COLUMN_TYPES = {
+    "implementation": "category",
+    "language": "category",
+    "size": "int32",
+    "time_sec": "float64",
+    "max_rss_kb": "int64",
+    "nodes": "int64",
+    "solutions": "float64",
+}
+
 
 def read_rows(csv_path):
-    with csv_path.open() as f:
-        reader = csv.DictReader(f)
-        rows = [row for row in reader]
-    for row in rows:
-        row["size"] = int(row["size"])
-        row["time_sec"] = float(row["time_sec"])
-        row["max_rss_kb"] = int(row["max_rss_kb"])
-        row["nodes"] = int(row["nodes"])
-        row["solutions"] = float(row["solutions"])
-    return rows
-
-
-def plot_metric(rows, metric, ylabel, output_dir):
-    plt.figure(figsize=(8, 5))
-    implementations = sorted(set(r["implementation"] for r in rows))
-    for impl in implementations:
-        subset = sorted((r for r in rows if r["implementation"] == impl), key=lambda r: r["size"])
-        plt.plot([r["size"] for r in subset], [r[metric] for r in subset], marker="o", label=impl)
-    plt.xlabel("Board size (N)")
-    plt.ylabel(ylabel)
-    plt.title(f"N-Queens {ylabel}")
-    plt.grid(True, linestyle="--", alpha=0.4)
-    plt.legend()
-    output_path = output_dir / f"nqueens_{metric}.png"
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150)
-    plt.close()
+    try:
+        return pd.read_csv(csv_path, dtype=COLUMN_TYPES, engine="pyarrow")
+    except ImportError:
+        # pyarrow is optional; the C parser is plenty for small result files.
+        return pd.read_csv(csv_path, dtype=COLUMN_TYPES, engine="c")
+
+
+def plot_metrics(df, output_dir):
+    # One reshape (sorted by size, one column per implementation) feeds
+    # every panel instead of regrouping the rows for each metric. Repeated
+    # (size, implementation) rows, e.g. from `--sizes 4 4` or merged CSVs,
+    # are averaged.
+    wide = df.pivot_table(
+        index="size",
+        columns="implementation",
+        values=[metric for metric, _ in METRICS],
+        aggfunc="mean",
+        observed=True,
+    )
+    # Draw straight onto an Agg canvas: no pyplot state machine, no backend
+    # probing, nothing to close afterwards.
+    fig = Figure(figsize=(18, 5))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(1, len(METRICS))
+    for ax, (metric, ylabel) in zip(axes, METRICS):
+        panel = wide[metric]
+        ax.plot(panel.index, panel.to_numpy(), marker="o", label=list(panel.columns))
+        ax.set_xlabel("Board size (N)")
+        ax.set_ylabel(ylabel)
+        ax.set_title(f"N-Queens {ylabel}")
+        ax.grid(True, linestyle="--", alpha=0.4)
+        ax.legend()
+    output_path = output_dir / "nqueens_all.png"
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=150)
     print(f"[plot] Saved {output_path}")
 
 
@@ -54,12 +87,10 @@ def main():
     parser.add_argument("--output", type=Path, default=Path("results"), help="Directory to store plots (default: results)")
     args = parser.parse_args()
 
-    rows = read_rows(args.input)
+    df = read_rows(args.input)
     args.output.mkdir(parents=True, exist_ok=True)
 
-    plot_metric(rows, "time_sec", "Runtime (s)", args.output)
-    plot_metric(rows, "max_rss_kb", "Peak RSS (KB)", args.output)
-    plot_metric(rows, "nodes", "Nodes created", args.output)
+    plot_metrics(df, args.output)
 
 
 if __name__ == "__main__":
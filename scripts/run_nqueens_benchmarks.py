@@ -1,31 +1,81 @@
 #!/usr/bin/env python3
 
 import argparse
+import contextlib
 import csv
+import functools
+import itertools
 import multiprocessing as mp
 import os
 import re
-import resource
 import shutil
 import shlex
+import sqlite3
 import subprocess
 import sys
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 ROOT = Path(__file__).resolve().parent.parent
 RESULTS_DIR = ROOT / "results"
+BUILD_STAMPS_DIR = ROOT / ".build-stamps"
+# BuDDy, Sylvan and CUDD and their solvers are all built with the same flags so
+# the cross-library comparison is not skewed by host tuning on only some of
+# them. (JSylvan's native library is built by its own script; see ensure_jsylvan.)
+NATIVE_CFLAGS = "-O3 -march=native"
 JOBS = max(1, os.cpu_count() or 1)
+STDOUT_TAIL_LINES = 64
+# Solvers that support it write one JSON line {"n":..,"solutions":..,"nodes":..}
+# to the file descriptor named by this variable; otherwise stdout is parsed.
+# The descriptor number is fixed so the variable can live in each
+# implementation's prebuilt environment.
+METRICS_FD_ENV = "NQUEENS_METRICS_FD"
+METRICS_FD = 100
+# Real-time priority for --fifo runs; high enough to preempt ordinary load.
+FIFO_PRIORITY = 50
+# (control file, value that disables boost): intel_pstate first, then the
+# generic cpufreq knob used by acpi-cpufreq/amd-pstate.
+TURBO_CONTROLS = [
+    (Path("/sys/devices/system/cpu/intel_pstate/no_turbo"), "1"),
+    (Path("/sys/devices/system/cpu/cpufreq/boost"), "0"),
+]
+# Resolved once so each launch execs the JVM directly instead of walking PATH.
+JAVA = shutil.which("java") or "java"
+# util-linux helpers used by --pin-core and --fifo.
+TASKSET = shutil.which("taskset")
+CHRT = shutil.which("chrt")
+# Solvers are launched through this small reaper so max_rss is the solver's
+# own: exec() keeps the replaced image's RSS peak in ru_maxrss, and without
+# the reaper that image is the whole Python driver.
+REAPER_SOURCE = ROOT / "scripts" / "rusage_reaper.c"
+REAPER = ROOT / "scripts" / "rusage_reaper"
+# AppCDS archives let the jar-based JVM launches map the solver's classes
+# instead of loading them again, so small boards measure the BDD work, not
+# JVM start-up. (JDD runs from a classes directory, which AppCDS cannot use.)
+JSYLVAN_CDS_ARCHIVE = ROOT / "jsylvan" / "target" / "nqueens.jsa"
+NDD_CDS_ARCHIVE = ROOT / "NDD" / "target" / "nqueens.jsa"
+FIELDNAMES = ["implementation", "language", "size", "time_sec", "max_rss_kb", "nodes", "solutions", "user_sec", "sys_sec"]
 
 
 class Implementation:
-    def __init__(self, name, language, preparer, command_builder, workdir=None, extra_env=None):
+    def __init__(self, name, language, preparer, command_builder, workdir=None, extra_env=None, artifacts=None):
         self.name = name
         self.language = language
         self.preparer = preparer
         self.command_builder = command_builder
         self.workdir = workdir or ROOT
         self.extra_env = extra_env or {}
+        self.artifacts = artifacts or []
+        # Resolved once; the dict is only read by subprocess, never mutated.
+        self._env = {**os.environ, **self.extra_env, METRICS_FD_ENV: str(METRICS_FD)}
 
     def ensure_ready(self):
         if self.preparer:
@@ -35,9 +85,65 @@ class Implementation:
         return self.command_builder(size, workers)
 
     def base_env(self):
-        env = os.environ.copy()
-        env.update(self.extra_env)
-        return env
+        return self._env
+
+    def fingerprint(self):
+        # mtime + size of the built artifacts; None disables result caching.
+        stamps = []
+        for artifact in self.artifacts:
+            try:
+                stat = artifact.stat()
+            except FileNotFoundError:
+                return None
+            stamps.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        return ";".join(stamps) or None
+
+
+# Measured rows keyed by implementation, size, worker count, measurement
+# mode and artifact fingerprint, so unchanged builds need not be measured
+# again and rows taken under different conditions are never mixed.
+class ResultCache:
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.columns = ["workers", "mode", "fingerprint", *FIELDNAMES]
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS measurements ("
+            f"{', '.join(self.columns)}, "
+            "PRIMARY KEY (implementation, size, workers, mode))"
+        )
+
+    def lookup(self, impl, size, workers, mode, fingerprint):
+        if fingerprint is None:
+            return None
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(FIELDNAMES)} FROM measurements "
+            "WHERE implementation = ? AND size = ? AND workers = ? AND mode = ? AND fingerprint = ?",
+            (impl.name, size, workers, mode, fingerprint),
+        )
+        found = cursor.fetchone()
+        return dict(zip(FIELDNAMES, found)) if found else None
+
+    def store(self, row, workers, mode, fingerprint):
+        if fingerprint is None:
+            return
+        values = [workers, mode, fingerprint, *(row[name] for name in FIELDNAMES)]
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO measurements ({', '.join(self.columns)}) "
+            f"VALUES ({', '.join('?' for _ in self.columns)})",
+            values,
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def library_path(directory):
+    # An empty LD_LIBRARY_PATH entry means the current directory to ld.so,
+    # so only append the inherited value when there is one.
+    inherited = os.environ.get("LD_LIBRARY_PATH")
+    return f"{directory}:{inherited}" if inherited else str(directory)
 
 
 def run(cmd, cwd=ROOT, env=None):
@@ -45,65 +151,159 @@ def run(cmd, cwd=ROOT, env=None):
     subprocess.run(cmd, cwd=cwd, env=env, check=True)
 
 
+def java_command(archive, classpath, main_class, *args):
+    # Without a usable archive the JVM simply starts the ordinary way.
+    sharing = [f"-XX:SharedArchiveFile={archive}", "-Xshare:auto"] if archive and archive.exists() else []
+    return [JAVA, *sharing, "-cp", classpath, main_class, *args]
+
+
+def ensure_cds_archive(name, archive, classpath, main_class, cwd, sources):
+    # AppCDS only archives classes loaded from jars, so this is for jar
+    # classpaths only. A failed dump is not fatal: the runs just go without it,
+    # and it is not retried until the jar changes.
+    failed = BUILD_STAMPS_DIR / f"{name}.cds-failed"
+    if _artifact_up_to_date(archive, sources) or _artifact_up_to_date(failed, sources):
+        return
+    try:
+        # A small board is enough to load every class the solver touches.
+        run([JAVA, f"-XX:ArchiveClassesAtExit={archive}", "-cp", classpath, main_class, "4"], cwd=cwd)
+        if not archive.exists():
+            raise OSError("the JVM exited without writing it")
+    except (subprocess.CalledProcessError, OSError) as exc:
+        print(f"[warn] Could not create class-data archive {archive.relative_to(ROOT)}: {exc}", file=sys.stderr)
+        archive.unlink(missing_ok=True)
+        BUILD_STAMPS_DIR.mkdir(exist_ok=True)
+        failed.touch()
+    else:
+        failed.unlink(missing_ok=True)
+
+
+def ensure_reaper():
+    if _artifact_up_to_date(REAPER, [REAPER_SOURCE]):
+        return
+    try:
+        run(["gcc", "-O2", "-o", str(REAPER), str(REAPER_SOURCE)])
+    except (subprocess.CalledProcessError, OSError) as exc:
+        REAPER.unlink(missing_ok=True)
+        print(
+            f"[warn] Could not build {REAPER.relative_to(ROOT)} ({exc}); max_rss_kb will include the driver's own peak RSS",
+            file=sys.stderr,
+        )
+
+
+def _sources(directory, *patterns):
+    return [path for pattern in patterns for path in directory.rglob(pattern)]
+
+
+def _artifact_up_to_date(artifact, sources):
+    if not artifact.exists():
+        return False
+    mtimes = [source.stat().st_mtime for source in sources if source.exists()]
+    return not mtimes or artifact.stat().st_mtime >= max(mtimes)
+
+
+def _build_stamp(name):
+    return BUILD_STAMPS_DIR / f"{name}.stamp"
+
+
+def _build_up_to_date(name, artifact, sources):
+    # make/gradle/mvn only rewrite outputs whose inputs really changed, so an
+    # unrelated or touched source would leave the artifact older forever.
+    # Compare against a stamp written after each successful build instead.
+    return artifact.exists() and _artifact_up_to_date(_build_stamp(name), sources)
+
+
+def _mark_built(name):
+    BUILD_STAMPS_DIR.mkdir(exist_ok=True)
+    _build_stamp(name).touch()
+
+
+def _flags_changed(name):
+    recorded = BUILD_STAMPS_DIR / f"{name}.flags"
+    return not recorded.exists() or recorded.read_text() != NATIVE_CFLAGS
+
+
+def _record_flags(name):
+    BUILD_STAMPS_DIR.mkdir(exist_ok=True)
+    (BUILD_STAMPS_DIR / f"{name}.flags").write_text(NATIVE_CFLAGS)
+
+
+@functools.lru_cache(maxsize=None)
 def ensure_buddy():
-    exe = ROOT / "BuDDy" / "examples" / "queen" / "queen"
-    lib = ROOT / "BuDDy" / "src" / "libbdd.la"
     buddy_dir = ROOT / "BuDDy"
+    exe = buddy_dir / "examples" / "queen" / "queen"
+    sources = _sources(buddy_dir / "src", "*.c", "*.h") + _sources(buddy_dir / "examples" / "queen", "*.cxx")
+    flags_changed = _flags_changed("buddy")
+    if not flags_changed and _build_up_to_date("buddy", exe, sources):
+        return
     configure_script = buddy_dir / "configure"
     if configure_script.exists() and not os.access(configure_script, os.X_OK):
         configure_script.chmod(configure_script.stat().st_mode | 0o111)
-    if not (buddy_dir / "config.status").exists():
-        run(["./configure"], cwd=buddy_dir)
-    if not lib.exists():
-        run(["make"], cwd=buddy_dir)
-    if not exe.exists():
-        run(["make", "-C", "examples/queen", "queen"], cwd=buddy_dir)
-    run(["make", "-C", "examples/queen", "queen"], cwd=buddy_dir)
-
-
+    if flags_changed or not (buddy_dir / "config.status").exists():
+        run(["./configure", f"CFLAGS={NATIVE_CFLAGS}", f"CXXFLAGS={NATIVE_CFLAGS}"], cwd=buddy_dir)
+        # make does not rebuild objects just because the flags changed.
+        run(["make", "clean"], cwd=buddy_dir)
+        exe.unlink(missing_ok=True)
+    run(["make", f"-j{JOBS}"], cwd=buddy_dir)
+    run(["make", f"-j{JOBS}", "-C", "examples/queen", "queen"], cwd=buddy_dir)
+    _record_flags("buddy")
+    _mark_built("buddy")
+
+
+@functools.lru_cache(maxsize=None)
 def ensure_sylvan():
-    binary = ROOT / "sylvan" / "build" / "examples" / "nqueens_fast"
-    if binary.exists():
+    sylvan_dir = ROOT / "sylvan"
+    binary = sylvan_dir / "build" / "examples" / "nqueens_fast"
+    sources = _sources(sylvan_dir / "src", "*.c", "*.h") + _sources(sylvan_dir / "examples", "*.c")
+    flags_changed = _flags_changed("sylvan")
+    if not flags_changed and _build_up_to_date("sylvan", binary, sources):
         return
-    run([
-        "cmake",
-        "-S", "sylvan",
-        "-B", "sylvan/build",
-        "-DSYLVAN_STATS=ON",
-        "-DBUILD_SHARED_LIBS=OFF",
-        "-DCMAKE_BUILD_TYPE=Release",
-    ])
+    if flags_changed or not (sylvan_dir / "build" / "CMakeCache.txt").exists():
+        # CMake rebuilds every target whose compile flags changed.
+        run([
+            "cmake",
+            "-S", "sylvan",
+            "-B", "sylvan/build",
+            "-DSYLVAN_STATS=ON",
+            "-DBUILD_SHARED_LIBS=OFF",
+            "-DCMAKE_BUILD_TYPE=Release",
+            f"-DCMAKE_C_FLAGS={NATIVE_CFLAGS}",
+            f"-DCMAKE_CXX_FLAGS={NATIVE_CFLAGS}",
+        ])
     run([
         "cmake",
         "--build", "sylvan/build",
         "--target", "nqueens_fast",
         f"-j{JOBS}",
     ])
+    _record_flags("sylvan")
+    _mark_built("sylvan")
 
 
+@functools.lru_cache(maxsize=None)
 def ensure_cudd():
     cudd_dir = ROOT / "cudd"
     lib = cudd_dir / "cudd" / ".libs" / "libcudd.a"
-    if not lib.exists():
+    lib_sources = _sources(cudd_dir / "cudd", "*.c", "*.h")
+    make_vars = ["ACLOCAL=true", "AUTOMAKE=true", "AUTOCONF=true", "AUTOHEADER=true"]
+    flags_changed = _flags_changed("cudd")
+    if flags_changed or not _build_up_to_date("cudd", lib, lib_sources):
         configure_script = cudd_dir / "configure"
         if configure_script.exists() and not os.access(configure_script, os.X_OK):
             configure_script.chmod(configure_script.stat().st_mode | 0o111)
-        if not (cudd_dir / "config.status").exists():
-            run(["./configure"], cwd=cudd_dir)
-        run([
-            "make",
-            f"-j{JOBS}",
-            "ACLOCAL=true",
-            "AUTOMAKE=true",
-            "AUTOCONF=true",
-            "AUTOHEADER=true",
-        ], cwd=cudd_dir)
-    exe = ROOT / "cudd" / "bin" / "nqueens_bdd"
-    if not exe.exists():
-        (ROOT / "cudd" / "bin").mkdir(parents=True, exist_ok=True)
+        if flags_changed or not (cudd_dir / "config.status").exists():
+            run(["./configure", f"CFLAGS={NATIVE_CFLAGS}", f"CXXFLAGS={NATIVE_CFLAGS}"], cwd=cudd_dir)
+            # make does not rebuild objects just because the flags changed.
+            run(["make", "clean", *make_vars], cwd=cudd_dir)
+        run(["make", f"-j{JOBS}", *make_vars], cwd=cudd_dir)
+        _record_flags("cudd")
+        _mark_built("cudd")
+    exe = cudd_dir / "bin" / "nqueens_bdd"
+    if not _artifact_up_to_date(exe, [cudd_dir / "examples" / "nqueens_bdd.c", lib]):
+        (cudd_dir / "bin").mkdir(parents=True, exist_ok=True)
         run([
             "gcc",
-            "-O3",
+            *NATIVE_CFLAGS.split(),
             "-I./cudd",
             "-I./cudd/cudd",
             "-I./cudd/mtr",
@@ -117,16 +317,18 @@ def ensure_cudd():
         ])
 
 
+@functools.lru_cache(maxsize=None)
 def ensure_jdd():
     classes_flag = ROOT / "jdd" / "build" / "classes" / "java" / "main" / "jdd" / "examples" / "BDDQueens.class"
-    if classes_flag.exists():
-        return
-    gradlew = ROOT / "jdd" / "gradlew"
-    if gradlew.exists() and not os.access(gradlew, os.X_OK):
-        gradlew.chmod(gradlew.stat().st_mode | 0o111)
-    run(["./gradlew", "--no-daemon", "classes"], cwd=ROOT / "jdd")
+    if not _build_up_to_date("jdd", classes_flag, _sources(ROOT / "jdd" / "src", "*.java")):
+        gradlew = ROOT / "jdd" / "gradlew"
+        if gradlew.exists() and not os.access(gradlew, os.X_OK):
+            gradlew.chmod(gradlew.stat().st_mode | 0o111)
+        run(["./gradlew", "--no-daemon", "classes"], cwd=ROOT / "jdd")
+        _mark_built("jdd")
 
 
+@functools.lru_cache(maxsize=None)
 def ensure_jsylvan():
     env_with_pkg = os.environ.copy()
     pkg_config = shutil.which("pkg-config")
@@ -135,6 +337,9 @@ def ensure_jsylvan():
         env_with_pkg["PKG_CONFIG_EXECUTABLE"] = pkg_config
 
     native_lib = ROOT / "jsylvan" / "src" / "main" / "resources" / "linux-x64" / "libsylvan-java.so"
+    # The native library comes from JSylvan's own build-sylvan.sh, which clones
+    # and builds Sylvan itself, so it keeps that script's flags and is only
+    # built when missing.
     if not native_lib.exists():
         build_script = ROOT / "jsylvan" / "src" / "main" / "c" / "sylvan-java" / "build-sylvan.sh"
         if build_script.exists() and not os.access(build_script, os.X_OK):
@@ -145,72 +350,189 @@ def ensure_jsylvan():
             "v1.4.1",
         ], cwd=ROOT / "jsylvan", env=env_with_pkg)
     jar = ROOT / "jsylvan" / "target" / "sylvan-1.0.0-SNAPSHOT.jar"
-    if not jar.exists():
+    if not _build_up_to_date("jsylvan", jar, _sources(ROOT / "jsylvan" / "src" / "main" / "java", "*.java") + [native_lib]):
         run(["mvn", "-q", "-DskipTests", "package"], cwd=ROOT / "jsylvan", env=env_with_pkg)
+        _mark_built("jsylvan")
+    ensure_cds_archive(
+        "jsylvan",
+        JSYLVAN_CDS_ARCHIVE,
+        "target/sylvan-1.0.0-SNAPSHOT.jar",
+        "jsylvan.examples.JSylvanNQueens",
+        ROOT / "jsylvan",
+        [jar],
+    )
 
 
+@functools.lru_cache(maxsize=None)
 def ensure_ndd():
     jar = ROOT / "NDD" / "target" / "ndd-1.0.1-jar-with-dependencies.jar"
     jdd_jar = ROOT / "NDD" / "lib" / "jdd-111.jar"
     if not jdd_jar.exists():
         raise FileNotFoundError(f"Missing NDD dependency {jdd_jar}")
     # Ensure local Maven repo has the JDD artifact
-    run([
-        "mvn",
-        "-q",
-        "install:install-file",
-        f"-Dfile={jdd_jar}",
-        "-DgroupId=org.bitbucket.vahidi",
-        "-DartifactId=JDD",
-        "-Dversion=111",
-        "-Dpackaging=jar",
-    ], cwd=ROOT / "NDD")
-    if jar.exists():
-        return
-    run(["mvn", "-q", "-DskipTests", "package"], cwd=ROOT / "NDD")
+    installed_jdd = Path.home() / ".m2" / "repository" / "org" / "bitbucket" / "vahidi" / "JDD" / "111" / "JDD-111.jar"
+    if not _artifact_up_to_date(installed_jdd, [jdd_jar]):
+        run([
+            "mvn",
+            "-q",
+            "install:install-file",
+            f"-Dfile={jdd_jar}",
+            "-DgroupId=org.bitbucket.vahidi",
+            "-DartifactId=JDD",
+            "-Dversion=111",
+            "-Dpackaging=jar",
+        ], cwd=ROOT / "NDD")
+    if not _build_up_to_date("ndd", jar, _sources(ROOT / "NDD" / "src", "*.java") + [jdd_jar]):
+        run(["mvn", "-q", "-DskipTests", "package"], cwd=ROOT / "NDD")
+        _mark_built("ndd")
+    ensure_cds_archive("ndd", NDD_CDS_ARCHIVE, str(jar), "application.nqueen.NDDSolution", ROOT / "NDD", [jar])
+
+
+def read_available(fd):
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def scheduled_command(cmd, pin_core, fifo):
+    # taskset/chrt set the policy before exec'ing the solver in place, so
+    # every thread it creates inherits it and wait4 still sees the solver.
+    if fifo:
+        cmd = [CHRT, "-f", str(FIFO_PRIORITY), *cmd]
+    if pin_core is not None:
+        cmd = [TASKSET, "-c", str(pin_core), *cmd]
+    return cmd
+
+
+@contextlib.contextmanager
+def turbo_disabled():
+    for control, value in TURBO_CONTROLS:
+        if control.exists():
+            break
+    else:
+        raise RuntimeError("No turbo control found (expected intel_pstate/no_turbo or cpufreq/boost)")
+    original = control.read_text().strip()
+    try:
+        control.write_text(value)
+    except PermissionError as exc:
+        raise RuntimeError(f"--no-turbo needs root to write {control}") from exc
+    print(f"[tune] {control} = {value}")
+    try:
+        yield
+    finally:
+        control.write_text(original)
+        print(f"[tune] {control} restored to {original}")
+
+
+def execute_with_metrics(cmd, cwd, env, pin_core=None, fifo=False):
+    # Only the NQUEENS_METRICS line matters, so stdout is streamed and just
+    # a short tail is kept for error reports; stderr is spooled to a file
+    # and only read back when the run fails. Driver memory therefore stays
+    # flat however verbose the solver is. wait4 reaps exactly this child and
+    # hands back its own rusage, so max_rss is per run rather than a
+    # session-wide RUSAGE_CHILDREN high-water mark.
+    #
+    # No preexec_fn or credential changes, so CPython launches the solver via
+    # vfork()+exec and the driver's page tables are never copied. The reaper,
+    # when built, sits between taskset/chrt and the solver and reports the
+    # solver's rusage on its own pipe.
+    tail = deque(maxlen=STDOUT_TAIL_LINES)
+    metrics_line = ""
+    try:
+        os.fstat(METRICS_FD)
+    except OSError:
+        pass
+    else:
+        raise RuntimeError(f"File descriptor {METRICS_FD} is already in use; cannot hand it to the solver")
+    report_read = report_write = None
+    if REAPER.exists():
+        report_read, report_write = os.pipe()
+        cmd = [str(REAPER), str(report_write), *cmd]
+    cmd = scheduled_command(cmd, pin_core, fifo)
+    metrics_read, metrics_write = os.pipe()
+    # pass_fds keeps descriptor numbers, so move the write end onto the fixed
+    # number the environment advertises.
+    os.dup2(metrics_write, METRICS_FD, inheritable=False)
+    os.close(metrics_write)
+    try:
+        with tempfile.TemporaryFile() as stderr:
+            start = time.perf_counter()
+            try:
+                proc = subprocess.Popen(
+                    cmd,
+                    cwd=cwd,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr,
+                    pass_fds=(METRICS_FD,) if report_write is None else (METRICS_FD, report_write),
+                    bufsize=1,
+                    text=True,
+                    errors="replace",
+                )
+            finally:
+                os.close(METRICS_FD)
+                if report_write is not None:
+                    os.close(report_write)
+            with proc.stdout:
+                for line in proc.stdout:
+                    if METRIC_PATTERN.search(line):
+                        metrics_line = line
+                    tail.append(line)
+            _, status, usage = os.wait4(proc.pid, 0)
+            elapsed = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            stderr_text = ""
+            if proc.returncode != 0:
+                stderr.seek(0)
+                stderr_text = stderr.read().decode(errors="replace")
+        # A grandchild may still hold the write end, so never block here.
+        os.set_blocking(metrics_read, False)
+        metrics_json = read_available(metrics_read)
+        max_rss, user_time, sys_time = usage.ru_maxrss, usage.ru_utime, usage.ru_stime
+        if report_read is not None:
+            # The reaper has exited, so its report is complete (or absent if
+            # it could not start the solver).
+            os.set_blocking(report_read, False)
+            report = read_available(report_read).split()
+            if len(report) == 3:
+                max_rss, user_time, sys_time = int(report[0]), float(report[1]), float(report[2])
+    finally:
+        os.close(metrics_read)
+        if report_read is not None:
+            os.close(report_read)
+    return {
+        "returncode": proc.returncode,
+        "stdout": "".join(tail),
+        "stderr": stderr_text,
+        "metrics_json": metrics_json,
+        "metrics_line": metrics_line,
+        "elapsed": elapsed,
+        "max_rss": max_rss,
+        "user_time": user_time,
+        "sys_time": sys_time,
+        "cmd": cmd,
+    }
 
 
-def execute_with_metrics(cmd, cwd, env):
-    queue = mp.Queue()
+# Solvers may print extra fields between the tokens, so the filler between
+# them stays permissive. Solution counts may come in exponent form (%g).
+METRIC_PATTERN = re.compile(
+    r"NQUEENS_METRICS\s+[^n]*n=(\d+)\s+[^s]*solutions=([0-9.eE+-]+)\s+[^n]*nodes=(\d+)",
+    re.ASCII,
+)
 
-    def worker():
-        start = time.perf_counter()
-        proc = subprocess.run(
-            cmd,
-            cwd=cwd,
-            env=env,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        elapsed = time.perf_counter() - start
-        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
-        queue.put({
-            "returncode": proc.returncode,
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
-            "elapsed": elapsed,
-            "max_rss": usage.ru_maxrss,
-            "cmd": cmd,
-        })
-
-    process = mp.Process(target=worker)
-    process.start()
-    process.join()
-    if not process.exitcode == 0:
-        raise RuntimeError("Measurement helper failed")
-    if queue.empty():
-        raise RuntimeError("Measurement helper returned no data")
-    return queue.get()
-
-
-METRIC_PATTERN = re.compile(r"NQUEENS_METRICS\s+[^n]*n=(\d+)\s+[^s]*solutions=([0-9.]+)\s+[^n]*nodes=(\d+)")
-def parse_metrics(stdout):
-    match = None
-    for line in stdout.strip().splitlines():
-        maybe = METRIC_PATTERN.search(line)
-        if maybe:
-            match = maybe
+
+def parse_metrics(line):
+    # The streaming loop in execute_with_metrics already picked out the last
+    # NQUEENS_METRICS line, so a single search is all that is left to do.
+    match = METRIC_PATTERN.search(line)
     if not match:
         raise RuntimeError("Failed to parse NQUEENS_METRICS from program output")
     size = int(match.group(1))
@@ -219,10 +541,41 @@ def parse_metrics(stdout):
     return size, solutions, nodes
 
 
-def run_implementation(impl, size, workers):
+def parse_json_metrics(payload):
+    lines = payload.strip().splitlines()
+    if not lines:
+        return None
+    data = json_loads(lines[-1])
+    return int(data["n"]), float(data["solutions"]), int(data["nodes"])
+
+
+# Environments handed to each pool process once at start-up, so tasks only
+# carry the implementation name instead of pickling a full env every run.
+POOL_ENVS = {}
+
+
+def init_pool_worker(slots, envs):
+    # Each pool process claims one CPU set for its whole lifetime, so
+    # concurrently running measurements never share cores.
+    os.sched_setaffinity(0, slots.get())
+    POOL_ENVS.update(envs)
+
+
+def measure_in_pool(cmd, cwd, impl_name, fifo):
+    result = execute_with_metrics(cmd, cwd, POOL_ENVS[impl_name], fifo=fifo)
+    if result["returncode"] == 0:
+        # The output tail only matters for error reports; don't ship it back.
+        result["stdout"] = ""
+    return result
+
+
+def run_implementation(impl, size, workers, pin_core=None, fifo=False):
     cmd = impl.command_for(size, workers)
-    env = impl.base_env()
-    result = execute_with_metrics(cmd, cwd=impl.workdir, env=env)
+    result = execute_with_metrics(cmd, cwd=impl.workdir, env=impl.base_env(), pin_core=pin_core, fifo=fifo)
+    return summarize_result(impl, size, result)
+
+
+def summarize_result(impl, size, result):
     if result["returncode"] != 0:
         raise subprocess.CalledProcessError(
             result["returncode"],
@@ -230,7 +583,10 @@ def run_implementation(impl, size, workers):
             output=result["stdout"],
             stderr=result["stderr"],
         )
-    measured_size, solutions, nodes = parse_metrics(result["stdout"])
+    metrics = parse_json_metrics(result["metrics_json"])
+    if metrics is None:
+        metrics = parse_metrics(result["metrics_line"])
+    measured_size, solutions, nodes = metrics
     if measured_size != size:
         raise RuntimeError(f"Implementation {impl.name} reported size {measured_size} but expected {size}")
     time_sec = result["elapsed"]
@@ -244,20 +600,65 @@ def run_implementation(impl, size, workers):
         "max_rss_kb": max_rss,
         "nodes": nodes,
         "solutions": solutions,
+        "user_sec": result["user_time"],
+        "sys_sec": result["sys_time"],
     }
 
 
+def run_parallel(jobs, workers, parallel, fifo=False):
+    cpus = sorted(os.sched_getaffinity(0))
+    width = max(1, workers)
+    slot_count = max(1, min(parallel, len(cpus) // width, len(jobs)))
+    slots = mp.Queue()
+    for i in range(slot_count):
+        slots.put(cpus[i * width:(i + 1) * width] or cpus)
+
+    envs = {impl.name: impl.base_env() for impl, _ in jobs}
+    with ProcessPoolExecutor(max_workers=slot_count, initializer=init_pool_worker, initargs=(slots, envs)) as executor:
+        futures = {}
+        for impl, size in jobs:
+            cmd = impl.command_for(size, workers)
+            future = executor.submit(measure_in_pool, cmd, impl.workdir, impl.name, fifo)
+            futures[future] = (impl, size)
+        try:
+            for future in as_completed(futures):
+                impl, size = futures[future]
+                yield summarize_result(impl, size, future.result())
+        except BaseException:
+            # Surface the failure now instead of after every queued run.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
 def write_results(rows, output_path):
+    # Rows go to a sibling .tmp file as soon as each run finishes, so an
+    # interrupted sweep still leaves the completed measurements there while
+    # the previous CSV stays intact; a finished sweep replaces it atomically.
     RESULTS_DIR.mkdir(exist_ok=True)
-    fieldnames = ["implementation", "language", "size", "time_sec", "max_rss_kb", "nodes", "solutions"]
-    with output_path.open("w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("w", newline="") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(FIELDNAMES)
         for row in rows:
-            writer.writerow(row)
+            writer.writerow([row[name] for name in FIELDNAMES])
+            csvfile.flush()
+    tmp_path.replace(output_path)
     print(f"[done] Results saved to {output_path.relative_to(ROOT)}")
 
 
+def measurement_mode(args):
+    parts = []
+    if args.parallel > 1:
+        parts.append(f"parallel={args.parallel}")
+    if args.pin_core is not None:
+        parts.append(f"pin-core={args.pin_core}")
+    if args.fifo:
+        parts.append("fifo")
+    if args.no_turbo:
+        parts.append("no-turbo")
+    return ",".join(parts) or "default"
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Run N-Queens benchmarks across multiple BDD implementations.")
     parser.add_argument(
@@ -281,10 +682,51 @@ def parse_args():
     )
     parser.add_argument(
         "--targets",
+        "--only",
+        "--impls",
+        dest="targets",
         nargs="+",
         default=["all"],
         help="Which implementations to run (default: all). Example: --targets BuDDy Sylvan JSylvan",
     )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the commands that would be benchmarked without building or running anything",
+    )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Reuse rows from the result cache when the implementation's build artifacts are unchanged",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=RESULTS_DIR / "cache.sqlite",
+        help="Result cache database; every fresh run is recorded here (default: results/cache.sqlite)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Number of benchmark runs to execute concurrently, each pinned to its own CPU set "
+             "(default: 1 = serial, best for reproducible measurements)",
+    )
+    parser.add_argument(
+        "--pin-core",
+        type=int,
+        help="Pin every solver process to this CPU core (not combinable with --parallel)",
+    )
+    parser.add_argument(
+        "--fifo",
+        action="store_true",
+        help="Run solvers under SCHED_FIFO to shield them from other load (needs CAP_SYS_NICE)",
+    )
+    parser.add_argument(
+        "--no-turbo",
+        action="store_true",
+        help="Disable CPU turbo boost for the duration of the sweep (needs root)",
+    )
     return parser.parse_args()
 
 
@@ -297,8 +739,9 @@ def build_implementations():
             lambda size, _: [str(ROOT / "BuDDy" / "examples" / "queen" / "queen"), str(size)],
             workdir=ROOT,
             extra_env={
-                "LD_LIBRARY_PATH": f"{ROOT / 'BuDDy' / 'src' / '.libs'}:{os.environ.get('LD_LIBRARY_PATH','')}",
+                "LD_LIBRARY_PATH": library_path(ROOT / "BuDDy" / "src" / ".libs"),
             },
+            artifacts=[ROOT / "BuDDy" / "examples" / "queen" / "queen", ROOT / "BuDDy" / "src" / "libbdd.la"],
         ),
         Implementation(
             "Sylvan",
@@ -311,51 +754,62 @@ def build_implementations():
             ],
             workdir=ROOT,
             extra_env={
-                "LD_LIBRARY_PATH": f"{ROOT / 'sylvan' / 'build' / 'src'}:{os.environ.get('LD_LIBRARY_PATH','')}",
+                "LD_LIBRARY_PATH": library_path(ROOT / "sylvan" / "build" / "src"),
             },
+            artifacts=[ROOT / "sylvan" / "build" / "examples" / "nqueens_fast"],
         ),
         Implementation(
             "CUDD",
             "C",
             ensure_cudd,
             lambda size, _: [str(ROOT / "cudd" / "bin" / "nqueens_bdd"), str(size)],
+            artifacts=[ROOT / "cudd" / "bin" / "nqueens_bdd"],
         ),
         Implementation(
             "JDD",
             "Java",
             ensure_jdd,
-            lambda size, _: [
-                "java",
-                "-cp", "build/classes/java/main",
+            # JDD runs from a classes directory, which AppCDS cannot archive.
+            lambda size, _: java_command(
+                None,
+                "build/classes/java/main",
                 "jdd.examples.BDDQueens",
                 str(size),
-            ],
+            ),
             workdir=ROOT / "jdd",
+            # Gradle only rewrites the classes a change touches, so the build
+            # stamp is what tracks library changes behind BDDQueens.class.
+            artifacts=[
+                ROOT / "jdd" / "build" / "classes" / "java" / "main" / "jdd" / "examples" / "BDDQueens.class",
+                _build_stamp("jdd"),
+            ],
         ),
         Implementation(
             "JSylvan",
             "Java",
             ensure_jsylvan,
-            lambda size, workers: [
-                "java",
-                "-cp", "target/sylvan-1.0.0-SNAPSHOT.jar",
+            lambda size, workers: java_command(
+                JSYLVAN_CDS_ARCHIVE,
+                "target/sylvan-1.0.0-SNAPSHOT.jar",
                 "jsylvan.examples.JSylvanNQueens",
                 "-w", str(workers),
                 str(size),
-            ],
+            ),
             workdir=ROOT / "jsylvan",
+            artifacts=[ROOT / "jsylvan" / "target" / "sylvan-1.0.0-SNAPSHOT.jar"],
         ),
         Implementation(
             "NDD",
             "Java",
             ensure_ndd,
-            lambda size, _: [
-                "java",
-                "-cp", str(ROOT / "NDD" / "target" / "ndd-1.0.1-jar-with-dependencies.jar"),
+            lambda size, _: java_command(
+                NDD_CDS_ARCHIVE,
+                str(ROOT / "NDD" / "target" / "ndd-1.0.1-jar-with-dependencies.jar"),
                 "application.nqueen.NDDSolution",
                 str(size),
-            ],
+            ),
             workdir=ROOT / "NDD",
+            artifacts=[ROOT / "NDD" / "target" / "ndd-1.0.1-jar-with-dependencies.jar"],
         ),
     ]
 
@@ -379,15 +833,61 @@ def main():
             seen.add(name)
             selected_impls.append(impl_map[name])
 
+    if args.pin_core is not None and args.parallel > 1:
+        raise ValueError("--pin-core cannot be combined with --parallel; parallel runs are pinned per CPU set")
+    if args.pin_core is not None and TASKSET is None:
+        raise RuntimeError("--pin-core needs taskset (util-linux) on PATH")
+    if args.fifo and CHRT is None:
+        raise RuntimeError("--fifo needs chrt (util-linux) on PATH")
+    if args.parallel > 1 and args.workers == 0:
+        # Auto-detection would see only the one CPU a pool slot is pinned to,
+        # so split the available CPUs evenly and pass that width explicitly.
+        args.workers = max(1, len(os.sched_getaffinity(0)) // args.parallel)
+        print(f"[info] --parallel {args.parallel} with --workers 0: each run gets {args.workers} worker(s)")
+
+    if args.dry_run:
+        for size in args.sizes:
+            for impl in selected_impls:
+                cmd = impl.command_for(size, args.workers)
+                print(f"[dry-run] {impl.name:10s} N={size:2d} $ {' '.join(shlex.quote(str(c)) for c in cmd)}")
+        return
+
+    ensure_reaper()
     for impl in selected_impls:
         impl.ensure_ready()
 
-    rows = []
+    cache = ResultCache(args.cache)
+    mode = measurement_mode(args)
+    fingerprints = {impl.name: impl.fingerprint() for impl in selected_impls}
+    cached_rows = []
+    jobs = []
     for size in args.sizes:
         for impl in selected_impls:
-            rows.append(run_implementation(impl, size, args.workers))
+            row = cache.lookup(impl, size, args.workers, mode, fingerprints[impl.name]) if args.use_cache else None
+            if row:
+                print(f"[cache] {impl.name:10s} N={size:2d} time={row['time_sec']:7.3f}s (artifact unchanged)")
+                cached_rows.append(row)
+            else:
+                jobs.append((impl, size))
+
+    if args.parallel > 1:
+        fresh_rows = run_parallel(jobs, args.workers, args.parallel, fifo=args.fifo)
+    else:
+        fresh_rows = (
+            run_implementation(impl, size, args.workers, pin_core=args.pin_core, fifo=args.fifo)
+            for impl, size in jobs
+        )
 
-    write_results(rows, args.output)
+    def remember(rows):
+        for row in rows:
+            cache.store(row, args.workers, mode, fingerprints[row["implementation"]])
+            yield row
+
+    try:
+        with turbo_disabled() if args.no_turbo else contextlib.nullcontext():
+            write_results(itertools.chain(cached_rows, remember(fresh_rows)), args.output)
+    finally:
+        cache.close()
 
 
 if __name__ == "__main__":
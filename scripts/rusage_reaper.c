@@ -0,0 +1,65 @@
+/*
+ * Runs a command and reports that command's own resource usage.
+ *
+ * Usage: rusage_reaper REPORT_FD COMMAND [ARG...]
+ *
+ * On exit, one line "max_rss_kb user_sec sys_sec" is written to REPORT_FD, and
+ * the command's exit status (or terminating signal) is passed through.
+ *
+ * exec() folds the old address space's RSS high-water mark into ru_maxrss.
+ * When the benchmark driver spawns a solver directly, that old address space
+ * is the driver's own, so every run would report at least the driver's peak
+ * RSS. Forking from this tiny process keeps that floor negligible.
+ */
+
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/resource.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+int main(int argc, char **argv)
+{
+    if (argc < 3) {
+        fprintf(stderr, "usage: %s REPORT_FD COMMAND [ARG...]\n", argv[0]);
+        return 127;
+    }
+    int report_fd = atoi(argv[1]);
+    /* The solver itself must not inherit the report channel. */
+    fcntl(report_fd, F_SETFD, FD_CLOEXEC);
+
+    pid_t pid = fork();
+    if (pid < 0) {
+        perror("rusage_reaper: fork");
+        return 127;
+    }
+    if (pid == 0) {
+        execvp(argv[2], argv + 2);
+        perror(argv[2]);
+        _exit(127);
+    }
+
+    int status;
+    struct rusage usage;
+    while (wait4(pid, &status, 0, &usage) < 0) {
+        if (errno != EINTR) {
+            perror("rusage_reaper: wait4");
+            return 127;
+        }
+    }
+    dprintf(report_fd, "%ld %ld.%06ld %ld.%06ld\n",
+            usage.ru_maxrss,
+            (long)usage.ru_utime.tv_sec, (long)usage.ru_utime.tv_usec,
+            (long)usage.ru_stime.tv_sec, (long)usage.ru_stime.tv_usec);
+    close(report_fd);
+
+    if (WIFSIGNALED(status)) {
+        signal(WTERMSIG(status), SIG_DFL);
+        raise(WTERMSIG(status));
+    }
+    return WEXITSTATUS(status);
+}